@@ -0,0 +1,86 @@
+"""
+Prebuilt test fixtures for test_service.py
+
+TEST_PDF_BYTES is the sample resume PDF that test_service.create_test_pdf()
+used to build with PyMuPDF on every call, baked in as a constant so tests
+don't pay for document construction. It was generated with
+build_test_pdf() below - run this module to print a fresh hex blob if the
+sample content ever changes.
+"""
+
+TEST_RESUME_TEXT = """
+    John Doe
+    Email: john.doe@example.com
+    Phone: +1-555-0123
+
+    EDUCATION
+    Bachelor of Science in Computer Science
+    MIT University, 2020
+
+    EXPERIENCE
+    Senior Software Engineer
+    Tech Company, 2020-Present
+
+    - Developed web applications using React and TypeScript
+    - Implemented backend services with Node.js and Python
+    - Worked with Docker and Kubernetes for deployment
+
+    SKILLS
+    React, TypeScript, Python, Node.js, Docker, Kubernetes, AWS, PostgreSQL
+    """
+
+TEST_PDF_BYTES = bytes.fromhex(
+    "255044462d312e370a25c2b5c2b60a25205772697474656e206279204d7550444620312e3238"
+    "2e320a0a312030206f626a0a3c3c2f547970652f436174616c6f672f50616765732032203020"
+    "522f496e666f3c3c2f50726f6475636572284d7550444620312e32382e32293e3e3e3e0a656e"
+    "646f626a0a0a322030206f626a0a3c3c2f547970652f50616765732f436f756e7420312f4b69"
+    "64735b34203020525d3e3e0a656e646f626a0a0a332030206f626a0a3c3c2f466f6e743c3c2f"
+    "68656c762035203020523e3e3e3e0a656e646f626a0a0a342030206f626a0a3c3c2f54797065"
+    "2f506167652f4d65646961426f785b30203020353935203834325d2f526f7461746520302f52"
+    "65736f75726365732033203020522f506172656e742032203020522f436f6e74656e74735b36"
+    "203020525d3e3e0a656e646f626a0a0a352030206f626a0a3c3c2f547970652f466f6e742f53"
+    "7562747970652f54797065312f42617365466f6e742f48656c7665746963612f456e636f6469"
+    "6e672f57696e416e7369456e636f64696e673e3e0a656e646f626a0a0a362030206f626a0a3c"
+    "3c2f4c656e677468203436392f46696c7465722f466c6174654465636f64653e3e0a73747265"
+    "616d0a78da7d533b6fdb3010def52b38076843f25e26607428daa55b016d41069b92902119ba"
+    "f4f7f7bb535c3fa218842dea78bcef71a7e1cff07d1c4aca5825494ed66a1adf86c797f9f56f"
+    "2a258d4b7ada7f7b1e7f0d397d29f2b5144ee38fe1695ff3baf8a08bee74c68eb193c81d1fd2"
+    "4586e8a4459b763ad4aca7fc59239fb38aed703e59d6ae8238213e7dac2319f7169d55bc4e3d"
+    "52a913892f3c3315aa44e75b5b3c984598b860d378e17923a782090147c065b10abe8b2ab009"
+    "d186a8b313445b280ea6964d8ca1a2dee66dd49fb80923cf339aa9df32dc3086f1bd666888df"
+    "7d1db213ffaf50213c43d106129804c6aa429ca902c5b4587505eca7e63a9007161b15a0c9bd"
+    "38eb8437f335cf3a49f67a1668c6f778d72966445c75b88bce2bbc00275177bac0499f8106d4"
+    "02479b77dba8babf144c0dac80e63d32aec1c72b08dcf36aee3ed8607fc9e40abf9de60c3319"
+    "8c570ebaf6fd189e39278ace687091e060dea57063062f8e493df8c97f16d922c3596fa3433a"
+    "ba11287c55d1bf84408f897bafc747832f1ef31ec584399abecfa5bfe7f0b19db4dc735f888f"
+    "9897ce5d68e3f4ec6adff633e2170afdfdc6897ea3a47fa2c1e3454c68ad0905c055f339c2c7"
+    "5cb87fe417919fe3f07bf807788f110c0a656e6473747265616d0a656e646f626a0a0a787265"
+    "660a3020370a303030303030303030302036353533352066200a303030303030303034322030"
+    "30303030206e200a30303030303030313230203030303030206e200a30303030303030313732"
+    "203030303030206e200a30303030303030323133203030303030206e200a3030303030303033"
+    "3230203030303030206e200a30303030303030343039203030303030206e200a0a747261696c"
+    "65720a3c3c2f53697a6520372f526f6f742031203020522f49445b3c31383539433342393144"
+    "433241334332393343333830433238333335433339433e3c4345333935374331433437413230"
+    "3732353543363339393141353741443132333e5d3e3e0a7374617274787265660a3934370a25"
+    "25454f460a"
+)
+
+
+def build_test_pdf():
+    """Build the sample resume PDF from scratch with PyMuPDF"""
+    from io import BytesIO
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((50, 50), TEST_RESUME_TEXT, fontsize=11)
+
+    pdf_bytes = BytesIO()
+    doc.save(pdf_bytes)
+    doc.close()
+
+    return pdf_bytes.getvalue()
+
+
+if __name__ == '__main__':
+    print(build_test_pdf().hex())
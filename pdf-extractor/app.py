@@ -8,12 +8,40 @@ Environment Variables:
 - PORT: Server port (default: 5000)
 - MAX_FILE_SIZE_MB: Maximum file size in MB (default: 10)
 - MIN_TEXT_LENGTH: Minimum text length to consider successful (default: 100)
+- PARALLEL_PAGE_THRESHOLD: Page count above which pages are extracted in a process pool (default: 16)
+- IN_MEMORY_MAX_MB: Uploads up to this size are parsed from memory instead of a temp file (default: 4)
+- ENABLE_RESULT_CACHE: Set to 1 to cache extraction results by the SHA1 of the uploaded PDF (default: 0)
+- RESULT_CACHE_SIZE: Maximum number of cached extraction results (default: 256)
+- ENABLE_TASK_QUEUE: Set to 1 to run extraction on Celery workers instead of in-process (default: 0, see tasks.py)
+- TASK_TIMEOUT: Seconds to wait for a queued extraction on synchronous requests (default: 60)
+- GEVENT_MONKEY_PATCH: Set to 1 to monkey-patch with gevent when not launched via gunicorn's gevent worker
+
+In production run under gunicorn with gevent workers (see gunicorn.conf.py).
 """
 
 import os
+
+# Must run before anything else imports socket/threading
+if os.getenv('GEVENT_MONKEY_PATCH') == '1':
+    from gevent import monkey
+    monkey.patch_all()
+
+import io
+import math
+import itertools
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import fitz  # PyMuPDF
-from flask import Flask, request, jsonify
-from werkzeug.utils import secure_filename
+import orjson
+from flask import Flask, request, jsonify, abort
+from flask.json.provider import JSONProvider
+from werkzeug.exceptions import HTTPException
+from streaming_form_data import StreamingFormDataParser
+from streaming_form_data.parser import ParseFailedException
+from streaming_form_data.targets import FileTarget, ValueTarget
 from dotenv import load_dotenv
 import tempfile
 import logging
@@ -28,55 +56,301 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider that serializes with orjson's C encoder"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS),
+            mimetype='application/json'
+        )
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Configuration
 MAX_FILE_SIZE_MB = int(os.getenv('MAX_FILE_SIZE_MB', '10'))
 MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
 MIN_TEXT_LENGTH = int(os.getenv('MIN_TEXT_LENGTH', '100'))
 ALLOWED_EXTENSIONS = {'pdf'}
+PARALLEL_PAGE_THRESHOLD = int(os.getenv('PARALLEL_PAGE_THRESHOLD', '16'))
+IN_MEMORY_MAX_BYTES = int(float(os.getenv('IN_MEMORY_MAX_MB', '4')) * 1024 * 1024)
+UPLOAD_CHUNK_SIZE = 64 * 1024
+ENABLE_RESULT_CACHE = os.getenv('ENABLE_RESULT_CACHE', '0') == '1'
+RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', '256'))
+ENABLE_TASK_QUEUE = os.getenv('ENABLE_TASK_QUEUE', '0') == '1'
+TASK_TIMEOUT = int(os.getenv('TASK_TIMEOUT', '60'))
+
+# Plain-text extraction flags - the same defaults page.get_text() uses, so
+# the explicit TextPage produces identical output (including the CID
+# fallback for glyphs without a Unicode mapping).
+TEXT_FLAGS = fitz.TEXTFLAGS_TEXT
 
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE_BYTES
 
+if ENABLE_TASK_QUEUE:
+    from celery.exceptions import TimeoutError as TaskTimeoutError
+    from tasks import celery_app, extract_text_task
+
+# Static response bodies, serialized once at import - /health is polled by
+# the orchestrator every few seconds per replica
+_HEALTH_BODY = orjson.dumps({
+    'status': 'healthy',
+    'service': 'pdf-text-extractor',
+    'version': '1.0.0'
+})
+_TOO_LARGE_BODY = orjson.dumps({
+    'ok': False,
+    'error': f'File too large. Maximum size: {MAX_FILE_SIZE_MB}MB',
+    'status': 'failed'
+})
+
+# SHA1 of PDF contents -> serialized extraction result, in LRU order
+_result_cache = OrderedDict()
+_result_cache_lock = threading.Lock()
+
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def extract_text_from_pdf(pdf_path):
+def _get_cached_result(sha1_hex):
+    """Return the cached response body for a PDF digest, or None"""
+    with _result_cache_lock:
+        body = _result_cache.get(sha1_hex)
+        if body is not None:
+            _result_cache.move_to_end(sha1_hex)
+        return body
+
+
+def _cache_result(sha1_hex, body):
+    """Store a response body, evicting the least recently used entry when full"""
+    with _result_cache_lock:
+        _result_cache[sha1_hex] = body
+        _result_cache.move_to_end(sha1_hex)
+        while len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+
+
+class _UploadDigestMixin:
+    """
+    Upload target mixin that hashes and sizes the file part while it is
+    received, in the same pass that stores it
+
+    Aborts with 413 as soon as the file part exceeds MAX_FILE_SIZE_BYTES,
+    which also covers uploads sent without a Content-Length.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sha1 = hashlib.sha1()
+        self.size = 0
+
+    def on_data_received(self, chunk):
+        self.size += len(chunk)
+        if self.size > MAX_FILE_SIZE_BYTES:
+            abort(413)
+        self.sha1.update(chunk)
+        super().on_data_received(chunk)
+
+
+class _HashingValueTarget(_UploadDigestMixin, ValueTarget):
+    """Collects the file part in memory, hashing and sizing it"""
+
+
+class _HashingFileTarget(_UploadDigestMixin, FileTarget):
+    """Streams the file part to disk, hashing and sizing it"""
+
+
+def _get_max_workers(page_count):
+    """Number of worker processes to use for a document with page_count pages"""
+    return max(1, min(os.cpu_count() or 1, page_count))
+
+
+# Page extraction pool, shared by all requests in this process. Created on
+# first use and recreated after a fork, since a pool inherited from the
+# parent (e.g. gunicorn's master with preload_app) has no usable workers.
+_page_pool = None
+_page_pool_pid = None
+_page_pool_lock = threading.Lock()
+
+
+def _get_page_pool():
+    """Return this process's page extraction pool, creating it if needed"""
+    global _page_pool, _page_pool_pid
+    with _page_pool_lock:
+        if _page_pool is None or _page_pool_pid != os.getpid():
+            _page_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+            _page_pool_pid = os.getpid()
+        return _page_pool
+
+
+def _reset_page_pool():
+    """Drop a broken page extraction pool so the next request starts a new one"""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is not None:
+            _page_pool.shutdown(wait=False)
+        _page_pool = None
+
+
+def _open_pdf(source):
+    """Open a PDF from a file path or from in-memory bytes"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=source, filetype='pdf')
+    return fitz.open(source)
+
+
+def _page_text(page):
+    """
+    Extract plain text from a page in content-stream order (no layout sort)
+
+    Builds the TextPage explicitly instead of going through page.get_text(),
+    which sets up its own TextPage through the generic extraction
+    dispatcher on every call. The TextPage is released on return.
+    """
+    textpage = page.get_textpage(flags=TEXT_FLAGS)
+    return textpage.extractText(sort=False)
+
+
+def _extract_page_block(source, start, stop):
+    """
+    Extract text from pages [start, stop) of a PDF
+
+    Runs inside a worker process, so it opens its own document -
+    fitz.Document objects cannot be shared across processes.
+
+    Returns:
+        tuple: (start, list of page texts)
+    """
+    doc = _open_pdf(source)
+    try:
+        return start, [_page_text(doc[page_num]) for page_num in range(start, stop)]
+    finally:
+        doc.close()
+        # Pool workers live across requests, so evict the MuPDF store here
+        # too - the parent's store_shrink() does not reach them
+        fitz.TOOLS.store_shrink(100)
+
+
+def _extract_pages_parallel(source, first_page, page_count):
+    """Extract pages [first_page, page_count) in blocks across a process pool, preserving page order"""
+    workers = _get_max_workers(page_count - first_page)
+    # One contiguous block of pages per task amortizes the per-task IPC cost
+    block_size = math.ceil((page_count - first_page) / workers)
+
+    try:
+        executor = _get_page_pool()
+        futures = [
+            executor.submit(_extract_page_block, source, start, min(start + block_size, page_count))
+            for start in range(first_page, page_count, block_size)
+        ]
+        blocks = sorted(future.result() for future in futures)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed by the OOM killer) - start a fresh pool
+        # on the next request and finish this one serially
+        logger.warning("Page extraction pool broke, falling back to serial extraction")
+        _reset_page_pool()
+        return _extract_page_block(source, first_page, page_count)[1]
+
+    return [text for _, texts in blocks for text in texts]
+
+
+def extract_text_from_pdf(source, parallel=True, keep_pages=False):
     """
     Extract text from PDF using PyMuPDF
 
+    Args:
+        source: path to a PDF file, or the PDF contents as bytes/memoryview
+        parallel: allow the per-page process pool (disable inside daemonic workers)
+        keep_pages: also return the text of each page as 'page_texts'
+
+    The first page is probed before anything else: if it has no text but
+    contains images, the PDF is treated as a scanned resume and returned as
+    needs_review without parsing the remaining pages.
+
+    Documents with more than PARALLEL_PAGE_THRESHOLD pages are split into
+    page blocks and extracted in the process's shared pool when more than
+    one CPU is available; smaller documents are extracted serially, since
+    shipping the PDF to the workers costs more than it saves.
+
     Returns:
         dict: {
             'ok': bool,
             'text': str (combined text from all pages),
-            'page_texts': list (text per page),
+            'page_texts': list (text per page, only with keep_pages),
             'pages': int,
             'chars': int,
             'hint': str (status hint),
             'status': str (success/needs_review/failed)
         }
     """
+    doc = None
     try:
         # Open PDF
-        doc = fitz.open(pdf_path)
-
-        page_texts = []
+        doc = _open_pdf(source)
+        page_count = len(doc)
+
+        # Probe the first page - a scanned resume has no text layer but
+        # carries the page image, and the rest of the document will be the same
+        first_text = _page_text(doc[0]) if page_count else ''
+        if page_count and not first_text.strip() and doc[0].get_images(full=False):
+            result = {
+                'ok': False,
+                'text': '',
+                'pages': page_count,
+                'chars': 0,
+                'hint': 'No text on first page but images found - possibly a scanned PDF',
+                'status': 'needs_review'
+            }
+            if keep_pages:
+                result['page_texts'] = []
+            return result
+
+        if (parallel and page_count > PARALLEL_PAGE_THRESHOLD
+                and _get_max_workers(page_count - 1) > 1):
+            # Workers open their own copies of the document
+            doc.close()
+            rest = _extract_pages_parallel(source, 1, page_count)
+        else:
+            # Extract text from each page lazily, so each page's text can be
+            # released as soon as it has been copied into the buffer
+            rest = (_page_text(doc[page_num]) for page_num in range(1, page_count))
+
+        texts = itertools.chain([first_text], rest) if page_count else ()
+
+        # Accumulate all page texts into a single buffer, remembering where
+        # each page starts and ends (when asked to) instead of keeping
+        # per-page copies
+        buf = io.StringIO()
+        page_offsets = []
+        position = 0
         total_chars = 0
 
-        # Extract text from each page
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            text = page.get_text()
-            page_texts.append(text)
+        for page_num, text in enumerate(texts):
+            if page_num:
+                buf.write('\n\n')
+                position += 2
+            buf.write(text)
+            if keep_pages:
+                page_offsets.append((position, position + len(text)))
+            position += len(text)
+            # strip() only scans the page ends; deleting whitespace from the
+            # joined text with str.translate is orders of magnitude slower on
+            # CJK resumes (no ASCII fast path) and would change the metric
             total_chars += len(text.strip())
 
-        doc.close()
-
-        # Combine all page texts
-        combined_text = '\n\n'.join(page_texts)
+        combined_text = buf.getvalue()
 
         # Determine status based on text length
         if total_chars == 0:
@@ -89,22 +363,23 @@ def extract_text_from_pdf(pdf_path):
             status = 'success'
             hint = 'Text extracted successfully'
 
-        return {
+        result = {
             'ok': status == 'success',
             'text': combined_text,
-            'page_texts': page_texts,
-            'pages': len(doc),
+            'pages': page_count,
             'chars': total_chars,
             'hint': hint,
             'status': status
         }
+        if keep_pages:
+            result['page_texts'] = [combined_text[start:end] for start, end in page_offsets]
+        return result
 
     except fitz.FileDataError as e:
         logger.error(f'Invalid PDF file: {str(e)}')
-        return {
+        result = {
             'ok': False,
             'text': '',
-            'page_texts': [],
             'pages': 0,
             'chars': 0,
             'hint': f'Invalid or corrupted PDF file',
@@ -112,25 +387,31 @@ def extract_text_from_pdf(pdf_path):
         }
     except Exception as e:
         logger.error(f'Error extracting text: {str(e)}')
-        return {
+        result = {
             'ok': False,
             'text': '',
-            'page_texts': [],
             'pages': 0,
             'chars': 0,
             'hint': f'Extraction error: {type(e).__name__}',
             'status': 'failed'
         }
+    finally:
+        if doc is not None and not doc.is_closed:
+            doc.close()
+        # MuPDF keeps fonts/images/objects in its global store after the
+        # document is closed; evict them so long-running workers keep a
+        # flat RSS instead of growing with every resume processed.
+        fitz.TOOLS.store_shrink(100)
+
+    if keep_pages:
+        result['page_texts'] = []
+    return result
 
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'service': 'pdf-text-extractor',
-        'version': '1.0.0'
-    })
+    return app.response_class(_HEALTH_BODY, mimetype='application/json')
 
 
 @app.route('/extract-text', methods=['POST'])
@@ -140,78 +421,203 @@ def extract_text():
 
     Expected request:
     - multipart/form-data with 'file' field containing PDF
+    - optional query arg pages=1 to include per-page texts as 'page_texts'
+    - optional query arg async=1 (task queue only): return 202 with a
+      task_id to poll at GET /extract-text/<task_id> instead of waiting
+
+    The multipart body is parsed incrementally from request.stream,
+    bypassing werkzeug's form parser. Uploads up to IN_MEMORY_MAX_BYTES are
+    kept in memory and opened directly by PyMuPDF; larger ones (or uploads
+    without a Content-Length) are written straight to a temp file.
 
     Returns:
     - JSON with extraction results
     """
 
-    # Validate request has file
-    if 'file' not in request.files:
+    # Reject oversized uploads before reading any of the body
+    if request.content_length is not None and request.content_length > MAX_FILE_SIZE_BYTES:
+        abort(413)
+
+    if request.mimetype != 'multipart/form-data':
         return jsonify({
             'ok': False,
             'error': 'No file provided',
             'status': 'failed'
         }), 400
 
-    file = request.files['file']
+    # Queued uploads are handed to the workers by path, so they always go to disk
+    in_memory = (
+        not ENABLE_TASK_QUEUE
+        and request.content_length is not None
+        and request.content_length <= IN_MEMORY_MAX_BYTES
+    )
+    temp_path = None
+
+    if in_memory:
+        target = _HashingValueTarget()
+    else:
+        temp_fd, temp_path = tempfile.mkstemp(suffix='.pdf')
+        os.close(temp_fd)
+        target = _HashingFileTarget(temp_path)
+
+    try:
+        # Stream the file part to its target
+        parser = StreamingFormDataParser(headers=request.headers)
+        parser.register('file', target)
+
+        while True:
+            chunk = request.stream.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.data_received(chunk)
+
+        # Validate request has file
+        if target.multipart_filename is None:
+            return jsonify({
+                'ok': False,
+                'error': 'No file provided',
+                'status': 'failed'
+            }), 400
+
+        # Validate filename
+        if target.multipart_filename == '':
+            return jsonify({
+                'ok': False,
+                'error': 'No file selected',
+                'status': 'failed'
+            }), 400
+
+        # Validate file type
+        if not allowed_file(target.multipart_filename):
+            return jsonify({
+                'ok': False,
+                'error': 'Only PDF files are allowed',
+                'status': 'failed'
+            }), 400
+
+        # Only used for logging - never touches the filesystem. Logged with
+        # repr() so CR/LF and other control characters can't forge log lines
+        filename = target.multipart_filename[:128]
+        digest = target.sha1.hexdigest()
+        keep_pages = request.args.get('pages') == '1'
+
+        # Identical PDFs (client retries, re-scoring passes) skip extraction
+        if ENABLE_RESULT_CACHE:
+            cache_key = f'{digest}:{int(keep_pages)}'
+            cached = _get_cached_result(cache_key)
+            if cached is not None:
+                logger.info(f'Result cache hit: {filename!r} (sha1: {digest})')
+                return app.response_class(cached, mimetype='application/json')
+
+        source = target.value if in_memory else temp_path
+
+        logger.info(f'Processing PDF: {filename!r} (size: {target.size} bytes)')
+
+        if ENABLE_TASK_QUEUE:
+            task = extract_text_task.delay(temp_path, keep_pages)
+            # The worker now owns the temp file and removes it when done
+            temp_path = None
+
+            if request.args.get('async') == '1':
+                return jsonify({
+                    'ok': True,
+                    'task_id': task.id,
+                    'status': 'queued'
+                }), 202, {'Location': f'/extract-text/{task.id}'}
+
+            result = task.get(timeout=TASK_TIMEOUT)
+        else:
+            # Extract text
+            result = extract_text_from_pdf(source, keep_pages=keep_pages)
+
+        # Log summary (without full text to avoid logging sensitive data)
+        logger.info(f'Extraction result - Status: {result["status"]}, Pages: {result["pages"]}, Chars: {result["chars"]}')
+
+        # The result can carry hundreds of KB of text; encode it directly
+        # with orjson rather than going through the provider layer
+        body = orjson.dumps(result)
+
+        # Failures may be transient, so only cache definitive outcomes
+        if ENABLE_RESULT_CACHE and result['status'] != 'failed':
+            _cache_result(cache_key, body)
 
-    # Validate filename
-    if file.filename == '':
+        return app.response_class(body, mimetype='application/json')
+
+    except ParseFailedException as e:
+        logger.error(f'Malformed multipart body: {str(e)}')
         return jsonify({
             'ok': False,
-            'error': 'No file selected',
+            'error': 'Malformed multipart body',
             'status': 'failed'
         }), 400
+    except HTTPException:
+        raise
+    except Exception as e:
+        if ENABLE_TASK_QUEUE and isinstance(e, TaskTimeoutError):
+            logger.error(f'Queued extraction timed out after {TASK_TIMEOUT}s')
+            return jsonify({
+                'ok': False,
+                'error': 'Extraction timed out',
+                'status': 'failed'
+            }), 504
 
-    # Validate file type
-    if not allowed_file(file.filename):
+        logger.error(f'Unexpected error: {str(e)}')
         return jsonify({
             'ok': False,
-            'error': 'Only PDF files are allowed',
+            'error': 'Internal server error',
             'status': 'failed'
-        }), 400
+        }), 500
 
-    # Save to temporary file and process
-    try:
-        # Create temp file with secure name
-        filename = secure_filename(file.filename)
+    finally:
+        # Clean up temp file
+        if temp_path is not None:
+            os.unlink(temp_path)
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            temp_path = temp_file.name
-            file.save(temp_path)
 
-        # Extract text
-        logger.info(f'Processing PDF: {filename} (size: {os.path.getsize(temp_path)} bytes)')
-        result = extract_text_from_pdf(temp_path)
+@app.route('/extract-text/<task_id>', methods=['GET'])
+def extract_text_status(task_id):
+    """
+    Poll the result of an extraction queued with /extract-text?async=1
 
-        # Log summary (without full text to avoid logging sensitive data)
-        logger.info(f'Extraction result - Status: {result["status"]}, Pages: {result["pages"]}, Chars: {result["chars"]}')
+    Returns:
+    - 202 while the task is queued or running
+    - JSON with extraction results once finished
+    """
+    if not ENABLE_TASK_QUEUE:
+        return jsonify({
+            'ok': False,
+            'error': 'Task queue is not enabled',
+            'status': 'failed'
+        }), 404
 
-        # Clean up temp file
-        os.unlink(temp_path)
+    task = celery_app.AsyncResult(task_id)
 
-        return jsonify(result)
+    if not task.ready():
+        return jsonify({
+            'ok': False,
+            'task_id': task_id,
+            'status': 'pending'
+        }), 202
 
-    except Exception as e:
-        logger.error(f'Unexpected error: {str(e)}')
+    if task.failed():
+        logger.error(f'Queued extraction {task_id} failed: {task.result!r}')
         return jsonify({
             'ok': False,
             'error': 'Internal server error',
             'status': 'failed'
         }), 500
 
+    return app.response_class(orjson.dumps(task.result), mimetype='application/json')
+
 
 @app.errorhandler(413)
 def request_entity_too_large(error):
     """Handle file too large error"""
-    return jsonify({
-        'ok': False,
-        'error': f'File too large. Maximum size: {MAX_FILE_SIZE_MB}MB',
-        'status': 'failed'
-    }), 413
+    return app.response_class(_TOO_LARGE_BODY, status=413, mimetype='application/json')
 
 
 if __name__ == '__main__':
+    # Development server only - use gunicorn -c gunicorn.conf.py app:app in production
     port = int(os.getenv('PORT', '5000'))
     debug = os.getenv('FLASK_ENV') == 'development'
 
@@ -0,0 +1,30 @@
+"""
+Gunicorn configuration for the PDF Text Extraction Microservice
+
+Usage:
+    gunicorn -c gunicorn.conf.py app:app
+
+Environment Variables:
+- PORT: Server port (default: 5000)
+- GUNICORN_WORKERS: Number of worker processes (default: CPU count)
+- GUNICORN_WORKER_CLASS: Worker class, gevent or sync (default: gevent)
+- GUNICORN_WORKER_CONNECTIONS: Concurrent requests per gevent worker (default: 25)
+- GUNICORN_TIMEOUT: Worker timeout in seconds (default: 60)
+
+Uploads are network-bound, so async (gevent) workers let one worker overlap
+several requests instead of blocking on a single slow upload. Greenlets all
+run on one OS thread, which matters: PyMuPDF initializes MuPDF in
+single-threaded mode and must not be called from several threads at once,
+so threaded (gthread) workers are not supported.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('GUNICORN_WORKERS', str(os.cpu_count() or 1)))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '25'))
+# PyMuPDF is not thread-safe - keep one thread per worker (gunicorn would
+# otherwise switch sync workers to gthread when threads > 1)
+threads = 1
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
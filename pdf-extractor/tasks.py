@@ -0,0 +1,53 @@
+"""
+Celery tasks for the PDF Text Extraction Microservice
+
+When ENABLE_TASK_QUEUE=1, the HTTP service only accepts uploads and hands the
+extraction to a pool of persistent Celery workers through Redis, so bursts of
+large PDFs queue up instead of blocking the web workers.
+
+Run a worker (from the pdf-extractor directory) with:
+    celery -A tasks worker --loglevel=info
+
+The web service and the workers must share the temp directory (TMPDIR)
+since uploads are handed over by path.
+
+Environment Variables:
+- CELERY_BROKER_URL: Broker URL (default: redis://localhost:6379/0)
+- CELERY_RESULT_BACKEND: Result backend URL (default: same as broker)
+- CELERY_WORKER_CONCURRENCY: Extractions per worker pod (default: 5)
+"""
+
+import os
+from celery import Celery
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', CELERY_BROKER_URL)
+
+celery_app = Celery('pdf_extractor', broker=CELERY_BROKER_URL, backend=CELERY_RESULT_BACKEND)
+celery_app.conf.update(
+    worker_concurrency=int(os.getenv('CELERY_WORKER_CONCURRENCY', '5')),
+    # One task at a time per worker process - extractions are long and uneven
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+    task_serializer='json',
+    result_serializer='json',
+    accept_content=['json'],
+)
+
+
+@celery_app.task(name='pdf_extractor.extract_text')
+def extract_text_task(pdf_path, keep_pages=False):
+    """Extract text from an uploaded PDF and remove the temp file afterwards"""
+    # Imported lazily: app imports this module when the task queue is enabled
+    from app import extract_text_from_pdf
+
+    try:
+        # Worker processes are daemonic and cannot spawn a page-level
+        # process pool; parallelism comes from the worker concurrency instead
+        return extract_text_from_pdf(pdf_path, parallel=False, keep_pages=keep_pages)
+    finally:
+        os.unlink(pdf_path)
@@ -10,44 +10,11 @@ import os
 import sys
 from io import BytesIO
 import fitz  # PyMuPDF
+from _test_fixtures import TEST_PDF_BYTES
 
 def create_test_pdf():
-    """Create a simple test PDF with sample resume text"""
-    doc = fitz.open()
-    page = doc.new_page()
-
-    # Add sample resume text
-    text = """
-    John Doe
-    Email: john.doe@example.com
-    Phone: +1-555-0123
-
-    EDUCATION
-    Bachelor of Science in Computer Science
-    MIT University, 2020
-
-    EXPERIENCE
-    Senior Software Engineer
-    Tech Company, 2020-Present
-
-    - Developed web applications using React and TypeScript
-    - Implemented backend services with Node.js and Python
-    - Worked with Docker and Kubernetes for deployment
-
-    SKILLS
-    React, TypeScript, Python, Node.js, Docker, Kubernetes, AWS, PostgreSQL
-    """
-
-    # Insert text
-    page.insert_text((50, 50), text, fontsize=11)
-
-    # Save to BytesIO
-    pdf_bytes = BytesIO()
-    doc.save(pdf_bytes)
-    doc.close()
-
-    pdf_bytes.seek(0)
-    return pdf_bytes.read()
+    """Return a simple test PDF with sample resume text (prebuilt, see _test_fixtures.py)"""
+    return TEST_PDF_BYTES
 
 def test_local_extraction():
     """Test PDF extraction locally without HTTP"""
@@ -64,10 +31,11 @@ def test_local_extraction():
     try:
         # Extract text
         doc = fitz.open(test_file)
+        page_count = len(doc)
         page_texts = []
         total_chars = 0
 
-        for page_num in range(len(doc)):
+        for page_num in range(page_count):
             page = doc[page_num]
             text = page.get_text()
             page_texts.append(text)
@@ -78,7 +46,7 @@ def test_local_extraction():
         combined_text = '\n\n'.join(page_texts)
 
         print(f"✅ Extraction successful!")
-        print(f"   Pages: {len(page_texts)}")
+        print(f"   Pages: {page_count}")
         print(f"   Characters: {total_chars}")
         print(f"\n📄 Extracted text preview:")
         print("-" * 60)
@@ -7,15 +7,41 @@
 - 生成 0-100 分数和 A/B/C/D 等级
 - 详细评分解释和风险点分析
 - 规则版本管理
+
+可选依赖：
+- pyahocorasick: 关键词多模式匹配（未安装时逐个子串查找）
+- orjson: 示例中的 JSON 输出（未安装时使用标准库 json）
 """
 
 import re
+import sys
 import json
-from typing import List, Dict, Any, Optional, Tuple, Union
-from dataclasses import dataclass, field, asdict
+import io
+import os
+import math
+import bisect
+import operator
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial, lru_cache
+from typing import List, Dict, Set, Any, Callable, Optional, Tuple, Union, NamedTuple
+from dataclasses import dataclass, field, asdict, replace
 from datetime import datetime
 from enum import Enum
 
+try:
+    import ahocorasick
+    _AHOCORASICK_AVAILABLE = True
+except ImportError:
+    _AHOCORASICK_AVAILABLE = False
+
+try:
+    import orjson
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    _ORJSON_AVAILABLE = False
+
 
 # ==================== 枚举类型 ====================
 
@@ -56,7 +82,10 @@ class RiskSeverity(str, Enum):
 
 # ==================== 数据类 ====================
 
-@dataclass
+# Python 3.10+ 使用 __slots__ 数据类：实例更小，属性访问更快
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_SLOTS)
 class SkillRule:
     skill: str
     weight: int
@@ -64,7 +93,7 @@ class SkillRule:
     pattern: Optional[str] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class NumericRule:
     field: str
     operator: NumericOperator
@@ -73,7 +102,7 @@ class NumericRule:
     label: str
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class EnumRule:
     field: str
     values: List[str]
@@ -81,14 +110,15 @@ class EnumRule:
     label: str
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class RejectRule:
     keyword: str
     penalty: int
     description: Optional[str] = None
+    per_occurrence: bool = False  # True 时按关键词出现次数（不重叠计数）累计扣分
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class GradeThresholds:
     A: int = 80
     B: int = 60
@@ -96,7 +126,7 @@ class GradeThresholds:
     D: int = 0
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ScoringRules:
     version: str
     must_skills: List[SkillRule] = field(default_factory=list)
@@ -107,11 +137,15 @@ class ScoringRules:
     grade_thresholds: GradeThresholds = field(default_factory=GradeThresholds)
     must_weight_multiplier: int = 10
     nice_weight_multiplier: int = 5
+    numeric_weight_multiplier: int = 5
+    enum_weight_multiplier: int = 5
+    enable_early_reject: bool = False
     created_at: Optional[str] = None
     description: Optional[str] = None
 
 
-@dataclass
+# 候选人数据只读：派生变体请用 dataclasses.replace
+@dataclass(frozen=True, **_SLOTS)
 class CandidateData:
     name: str
     email: str
@@ -127,30 +161,53 @@ class CandidateData:
     extra_fields: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class MatchedItem:
     name: str
     weight: int
     score: float
     matched_via: Optional[str] = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'weight': self.weight,
+            'score': self.score,
+            'matched_via': self.matched_via,
+        }
 
-@dataclass
+
+@dataclass(**_SLOTS)
 class MissingItem:
     name: str
     weight: int
     potential_score: float
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'weight': self.weight,
+            'potential_score': self.potential_score,
+        }
+
 
-@dataclass
+@dataclass(**_SLOTS)
 class RiskItem:
     type: RiskType
     severity: RiskSeverity
     description: str
     impact: str
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'type': self.type,
+            'severity': self.severity,
+            'description': self.description,
+            'impact': self.impact,
+        }
 
-@dataclass
+
+@dataclass(**_SLOTS)
 class ScoringResult:
     total_score: float
     grade: Grade
@@ -178,14 +235,212 @@ class ScoringResult:
     rule_version: str
     scored_at: str
 
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（与 asdict 结果相同，但不做反射和深拷贝）"""
+        return {
+            'total_score': self.total_score,
+            'grade': self.grade,
+            'must_score': self.must_score,
+            'nice_score': self.nice_score,
+            'numeric_score': self.numeric_score,
+            'enum_score': self.enum_score,
+            'reject_penalty': self.reject_penalty,
+            'matched_must': [m.to_dict() for m in self.matched_must],
+            'matched_nice': [m.to_dict() for m in self.matched_nice],
+            'matched_numeric': [m.to_dict() for m in self.matched_numeric],
+            'matched_enum': [m.to_dict() for m in self.matched_enum],
+            'matched_reject': list(self.matched_reject),
+            'missing_must': [m.to_dict() for m in self.missing_must],
+            'missing_nice': [m.to_dict() for m in self.missing_nice],
+            'risks': [r.to_dict() for r in self.risks],
+            'explanation': self.explanation,
+            'summary': self.summary,
+            'rule_version': self.rule_version,
+            'scored_at': self.scored_at,
+        }
+
+
+# ==================== 内部评估结果 ====================
+
+class MatchCheck(NamedTuple):
+    matched: bool
+    via: Optional[str] = None
+
+
+class SkillEval(NamedTuple):
+    score: float
+    matched: List[MatchedItem]
+    missing: List[MissingItem]
+
+
+class NumericEval(NamedTuple):
+    score: float
+    matched: List[MatchedItem]
+
+
+class EnumEval(NamedTuple):
+    score: float
+    matched: List[MatchedItem]
+
+
+class RejectEval(NamedTuple):
+    penalty: float
+    matched: List[str]
+    occurrences: Dict[str, int]  # 按次扣分的关键词 -> 出现次数
+
+
+# ==================== 数值规则比较 ====================
+
+# 数值规则比较用的操作符表：阈值在左，matcher(v) = op(阈值, v)
+_NUMERIC_COMPARATORS: Dict[NumericOperator, Callable[[Any, Any], Any]] = {
+    NumericOperator.GTE: operator.le,
+    NumericOperator.LTE: operator.ge,
+    NumericOperator.GT: operator.lt,
+    NumericOperator.LT: operator.gt,
+    NumericOperator.EQ: operator.eq,
+}
+
+
+# ==================== 正则编译缓存 ====================
+
+@lru_cache(maxsize=512)
+def _compile_pattern(pattern: str) -> re.Pattern:
+    """编译技能正则（忽略大小写），同一模式在多个引擎/规则版本间共享"""
+    return re.compile(pattern, re.IGNORECASE)
+
 
 # ==================== 规则引擎核心 ====================
 
+# 可以进入评分缓存键的值类型（按精确类型判断，子类不缓存）
+_CACHE_KEY_TYPES = (str, int, bool, type(None))
+
+
 class ScoringEngine:
-    def __init__(self, rules: ScoringRules):
+    _GRADE_CONCLUSIONS = {
+        Grade.A: '✓ 优秀候选人，强烈推荐面试',
+        Grade.B: '✓ 合格候选人，建议面试',
+        Grade.C: '⚠ 基本合格，可考虑备选',
+        Grade.D: '✗ 不符合岗位要求，不推荐',
+    }
+
+    def __init__(self, rules: ScoringRules, cache_size: int = 0):
+        """cache_size > 0 时按候选人内容缓存 score() 结果（LRU，最多 cache_size 条）
+
+        命中缓存时返回结果的浅拷贝：各列表是新的，可以排序、增删；
+        列表中的 MatchedItem/MissingItem/RiskItem 仍与缓存共享，不要就地修改
+        """
         self.rules = rules
         self._validate_rules()
 
+        self._cache_size = cache_size
+        self._cache: 'OrderedDict[Tuple, ScoringResult]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        # 规则中的关键词与枚举值在构造时统一转小写
+        self._must_skill_lowers = [r.skill.lower() for r in self.rules.must_skills]
+        self._nice_skill_lowers = [r.skill.lower() for r in self.rules.nice_skills]
+        self._reject_keyword_lowers = [r.keyword.lower() for r in self.rules.reject_rules]
+        self._enum_value_sets = [frozenset(v.lower() for v in r.values) for r in self.rules.enum_rules]
+
+        # 关键词技能与拒绝关键词合并为一个自动机，每份简历只扫描一遍
+        self._keywords = {
+            skill_lower
+            for rule, skill_lower in zip(
+                self.rules.must_skills + self.rules.nice_skills,
+                self._must_skill_lowers + self._nice_skill_lowers
+            )
+            if rule.type == MatchType.KEYWORD
+        }
+        self._keywords.update(self._reject_keyword_lowers)
+
+        # 解释文本中按关键词查扣分；同一关键词有多条规则时取第一条
+        self._reject_by_keyword: Dict[str, RejectRule] = {}
+        for rule in self.rules.reject_rules:
+            self._reject_by_keyword.setdefault(rule.keyword, rule)
+        self._keyword_automaton = self._build_keyword_automaton()
+
+        # 数值规则的操作符在构造时特化为比较函数
+        self._numeric_matchers = self._build_numeric_matchers()
+
+        # 字段读取方式（实例属性或 extra_fields）在构造时确定
+        self._numeric_accessors = [self._build_field_accessor(r.field) for r in self.rules.numeric_rules]
+        self._enum_accessors = [self._build_field_accessor(r.field) for r in self.rules.enum_rules]
+
+        # 等级阈值按升序排列，定级时二分查找
+        thresholds = self.rules.grade_thresholds
+        self._grade_thresholds_sorted = [thresholds.D, thresholds.C, thresholds.B, thresholds.A]
+        self._grades_sorted = [Grade.D, Grade.C, Grade.B, Grade.A]
+
+        # 每条规则命中时的得分（权重 × 倍数）在构造时算好
+        self._must_scores = [r.weight * self.rules.must_weight_multiplier for r in self.rules.must_skills]
+        self._nice_scores = [r.weight * self.rules.nice_weight_multiplier for r in self.rules.nice_skills]
+        self._numeric_plan = list(zip(
+            self.rules.numeric_rules,
+            self._numeric_accessors,
+            self._numeric_matchers,
+            [r.weight * self.rules.numeric_weight_multiplier for r in self.rules.numeric_rules]
+        ))
+        self._enum_plan = list(zip(
+            self.rules.enum_rules,
+            self._enum_accessors,
+            self._enum_value_sets,
+            [r.weight * self.rules.enum_weight_multiplier for r in self.rules.enum_rules]
+        ))
+
+        # 所有加分规则全部命中时的最高得分，拒绝扣分达到它即可提前判定；
+        # 负权重规则不命中时得分更高，按 0 计
+        self._max_possible_positive = (
+            sum(max(0, s) for s in self._must_scores) +
+            sum(max(0, s) for s in self._nice_scores) +
+            sum(max(0, item_score) for *_, item_score in self._numeric_plan) +
+            sum(max(0, item_score) for *_, item_score in self._enum_plan)
+        )
+
+        # score_total 的逐候选人上界：关键词技能扫描后即可确定，其余规则按全部命中计；
+        # 与 _max_possible_positive 一样，负权重按 0 计
+        self._keyword_skill_scores = []
+        self._max_non_keyword_positive = 0
+        for rule, skill_lower, item_score in zip(
+            self.rules.must_skills + self.rules.nice_skills,
+            self._must_skill_lowers + self._nice_skill_lowers,
+            self._must_scores + self._nice_scores
+        ):
+            if rule.type == MatchType.KEYWORD:
+                if item_score > 0:
+                    self._keyword_skill_scores.append((skill_lower, item_score))
+            else:
+                self._max_non_keyword_positive += max(0, item_score)
+        self._max_non_keyword_positive += (
+            sum(max(0, item_score) for *_, item_score in self._numeric_plan) +
+            sum(max(0, item_score) for *_, item_score in self._enum_plan)
+        )
+
+    def _build_keyword_automaton(self):
+        """构建关键词 Aho-Corasick 自动机"""
+        # 空关键词无法加入自动机，由 _scan_keywords 单独处理
+        keywords = [kw for kw in self._keywords if kw]
+        if not _AHOCORASICK_AVAILABLE or not keywords:
+            return None
+
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return automaton
+
+    def _scan_keywords(self, raw_text_lower: str) -> Set[str]:
+        """找出简历文本中出现的所有规则关键词"""
+        if self._keyword_automaton is None:
+            # 逐个 in 查找走 C 层快速子串搜索，比合并成一个交替正则更快，
+            # 对中文简历也比编码成 bytes 后查找更快
+            return {kw for kw in self._keywords if kw in raw_text_lower}
+
+        found = {kw for _, kw in self._keyword_automaton.iter(raw_text_lower)}
+        # 空关键词无法加入自动机，但按子串语义总是命中
+        if '' in self._keywords:
+            found.add('')
+        return found
+
     def _validate_rules(self) -> None:
         """验证规则配置"""
         if not self.rules.version:
@@ -198,42 +453,264 @@ class ScoringEngine:
         if thresholds.A < thresholds.B or thresholds.B < thresholds.C or thresholds.C < thresholds.D:
             raise ValueError('Invalid grade thresholds: A >= B >= C >= D')
 
-    def score(self, candidate: CandidateData) -> ScoringResult:
-        """评分主函数"""
+        # 正则在构造时编译并校验，按规则对象 id 索引；评分时不会再出错
+        self._compiled_patterns: Dict[int, re.Pattern] = {}
+        invalid_patterns = []
+        for rule in self.rules.must_skills + self.rules.nice_skills:
+            if rule.type == MatchType.REGEX and rule.pattern:
+                try:
+                    self._compiled_patterns[id(rule)] = _compile_pattern(rule.pattern)
+                except re.error as e:
+                    invalid_patterns.append(f'{rule.skill}: {rule.pattern!r} ({e})')
+
+        if invalid_patterns:
+            raise ValueError(f"Invalid regex patterns: {'; '.join(invalid_patterns)}")
+
+    def score(self, candidate: CandidateData, generate_explanation: bool = True) -> ScoringResult:
+        """评分主函数
+
+        generate_explanation=False 时跳过解释与总结文本（均为空字符串），
+        适合只需要分数和等级做排序/筛选的场景。
+        开启缓存时，内容相同的候选人返回缓存结果的浅拷贝（scored_at 为首次评分时间）
+        """
+        if not self._cache_size:
+            return self._score(candidate, generate_explanation=generate_explanation)
+
+        key = self._cache_key(candidate, generate_explanation)
+        if key is None:
+            return self._score(candidate, generate_explanation=generate_explanation)
+
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return self._copy_result(cached)
+
+        result = self._score(candidate, generate_explanation=generate_explanation)
+
+        with self._cache_lock:
+            self._cache[key] = self._copy_result(result)
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _copy_result(result: ScoringResult) -> ScoringResult:
+        """复制结果及其列表，避免调用方修改列表影响缓存"""
+        return replace(
+            result,
+            matched_must=list(result.matched_must),
+            matched_nice=list(result.matched_nice),
+            matched_numeric=list(result.matched_numeric),
+            matched_enum=list(result.matched_enum),
+            matched_reject=list(result.matched_reject),
+            missing_must=list(result.missing_must),
+            missing_nice=list(result.missing_nice),
+            risks=list(result.risks),
+        )
+
+    def score_total(self, candidate: CandidateData) -> Union[int, float]:
+        """只计算总分（与 score().total_score 相同），不构造匹配明细、风险与解释
+
+        适合大批量排序/初筛，只对入围候选人再调用 score() 生成完整结果
+        """
+        raw_text_lower = candidate.raw_text.lower()
+        found_keywords = self._scan_keywords(raw_text_lower)
+
+        penalty = self._evaluate_reject_rules(found_keywords, raw_text_lower).penalty
+
+        # 只返回总分，提前判定不会改变结果，因此不受 enable_early_reject 影响
+        if penalty > 0 and penalty >= self._max_possible_positive:
+            return 0
+
+        skills_lower = {s.lower() for s in candidate.skills}
+
+        # 按本候选人命中的关键词技能收紧上界，仍抵不过扣分时跳过正则、数值与枚举规则
+        if penalty > 0:
+            upper_bound = self._max_non_keyword_positive
+            for skill_lower, item_score in self._keyword_skill_scores:
+                if skill_lower in skills_lower or skill_lower in found_keywords:
+                    upper_bound += item_score
+            if penalty >= upper_bound:
+                return 0
+
+        # 各类得分分别按规则顺序累加，保证与 score() 的浮点结果完全一致
+        must_score = 0
+        for rule, skill_lower, item_score in zip(self.rules.must_skills, self._must_skill_lowers, self._must_scores):
+            if self._match_skill(rule, skill_lower, skills_lower, raw_text_lower, found_keywords).matched:
+                must_score += item_score
+
+        nice_score = 0
+        for rule, skill_lower, item_score in zip(self.rules.nice_skills, self._nice_skill_lowers, self._nice_scores):
+            if self._match_skill(rule, skill_lower, skills_lower, raw_text_lower, found_keywords).matched:
+                nice_score += item_score
+
+        numeric_score = 0
+        for _, accessor, matcher, item_score in self._numeric_plan:
+            if matcher(self._numeric_value(candidate, accessor)):
+                numeric_score += item_score
+
+        enum_score = 0
+        for _, accessor, value_set, item_score in self._enum_plan:
+            field_value = accessor(candidate)
+            if field_value and str(field_value).lower() in value_set:
+                enum_score += item_score
+
+        total_score = max(0, min(100, must_score + nice_score + numeric_score + enum_score - penalty))
+        # 与 ScoringResult.total_score 相同，保留一位小数
+        return round(total_score, 1)
+
+    def _cache_key(self, candidate: CandidateData, generate_explanation: bool) -> Optional[Tuple]:
+        """由候选人全部字段组成缓存键；含非基本类型的值时返回 None（不缓存）
+
+        每个值都带上类型：1、1.0、True 作为字典键相等，但 str() 后的枚举匹配结果不同
+        """
+        typed = self._typed_cache_value
+        try:
+            return (
+                generate_explanation,
+                tuple(map(typed, (
+                    candidate.name,
+                    candidate.email,
+                    candidate.phone,
+                    candidate.education,
+                    candidate.school,
+                    candidate.major,
+                    candidate.work_years,
+                    candidate.raw_text,
+                    candidate.graduation_date,
+                ))),
+                tuple(map(typed, candidate.skills)),
+                tuple(map(typed, candidate.projects)),
+                tuple(sorted((k, typed(v)) for k, v in candidate.extra_fields.items())),
+            )
+        except TypeError:
+            return None
+
+    @staticmethod
+    def _typed_cache_value(value: Any) -> Tuple[type, Any]:
+        """缓存键中的单个值：(类型, 值)；浮点数用 repr 区分 0.0 与 -0.0"""
+        value_type = type(value)
+        if value_type is float:
+            return value_type, repr(value)
+        if value_type not in _CACHE_KEY_TYPES:
+            raise TypeError(f'Uncacheable value type: {value_type.__name__}')
+        return value_type, value
+
+    def invalidate_cache(self) -> None:
+        """清空评分缓存"""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def score_batch(
+        self,
+        candidates: List[CandidateData],
+        generate_explanation: bool = True
+    ) -> List[ScoringResult]:
+        """批量评分，结果顺序与输入一致"""
+        return [self._score(c, generate_explanation=generate_explanation) for c in candidates]
+
+    def score_batch_parallel(
+        self,
+        candidates: List[CandidateData],
+        max_workers: Optional[int] = None,
+        use_processes: bool = True,
+        generate_explanation: bool = True
+    ) -> List[ScoringResult]:
+        """并行批量评分，结果顺序与输入一致
+
+        use_processes=True 时每个工作进程按同一份规则重建引擎，适合大批量、
+        规则多的场景；False 时在线程池中共享当前引擎。评分全程持有 GIL
+        （正则、子串和自动机扫描都不释放），线程池没有 CPU 并行效果，
+        只会多出调度开销，仅在无法创建子进程的环境中使用。
+        """
+        if not candidates:
+            return []
+
+        workers = max_workers or os.cpu_count() or 1
+
+        if not use_processes:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(
+                    partial(self.score, generate_explanation=generate_explanation),
+                    candidates
+                ))
+
+        chunksize = max(1, len(candidates) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker_engine,
+            initargs=(self.rules,)
+        ) as executor:
+            return list(executor.map(
+                partial(_score_with_worker_engine, generate_explanation=generate_explanation),
+                candidates,
+                chunksize=chunksize
+            ))
+
+    def _score(
+        self,
+        candidate: CandidateData,
+        generate_explanation: bool = True
+    ) -> ScoringResult:
+        """单个候选人评分"""
         start_time = datetime.now().isoformat()
 
-        # 1. 技能匹配
-        must_results = self._evaluate_skills(
-            candidate,
-            self.rules.must_skills,
-            self.rules.must_weight_multiplier
+        # 0. 候选人文本预处理只做一次，并一次扫描找出全部关键词
+        raw_text_lower = candidate.raw_text.lower()
+        found_keywords = self._scan_keywords(raw_text_lower)
+
+        # 1. 拒绝规则检查（先于其他规则，扣分足够大时直接跳过）
+        reject_results = self._evaluate_reject_rules(found_keywords, raw_text_lower)
+        early_reject = (
+            self.rules.enable_early_reject and
+            reject_results.penalty > 0 and
+            reject_results.penalty >= self._max_possible_positive
         )
 
-        nice_results = self._evaluate_skills(
-            candidate,
-            self.rules.nice_skills,
-            self.rules.nice_weight_multiplier
-        )
+        if early_reject:
+            # 无论其他规则如何匹配，总分都会被截断为 0
+            must_results = nice_results = SkillEval(0, [], [])
+            numeric_results = NumericEval(0, [])
+            enum_results = EnumEval(0, [])
+        else:
+            skills_lower = {s.lower() for s in candidate.skills}
+
+            # 2. 技能匹配
+            must_results = self._evaluate_skills(
+                self.rules.must_skills,
+                self._must_skill_lowers,
+                self._must_scores,
+                raw_text_lower,
+                skills_lower,
+                found_keywords
+            )
 
-        # 2. 数值规则评估
-        numeric_results = self._evaluate_numeric_rules(candidate)
+            nice_results = self._evaluate_skills(
+                self.rules.nice_skills,
+                self._nice_skill_lowers,
+                self._nice_scores,
+                raw_text_lower,
+                skills_lower,
+                found_keywords
+            )
 
-        # 3. 枚举规则评估
-        enum_results = self._evaluate_enum_rules(candidate)
+            # 3. 数值规则评估
+            numeric_results = self._evaluate_numeric_rules(candidate)
 
-        # 4. 拒绝规则检查
-        reject_results = self._evaluate_reject_rules(candidate)
+            # 4. 枚举规则评估
+            enum_results = self._evaluate_enum_rules(candidate)
 
         # 5. 计算总分
         total_score = max(
             0,
             min(
                 100,
-                must_results['score'] +
-                nice_results['score'] +
-                numeric_results['score'] +
-                enum_results['score'] -
-                reject_results['penalty']
+                must_results.score +
+                nice_results.score +
+                numeric_results.score +
+                enum_results.score -
+                reject_results.penalty
             )
         )
 
@@ -249,38 +726,41 @@ class ScoringEngine:
         )
 
         # 8. 生成解释
-        explanation = self._generate_explanation(
-            candidate,
-            total_score,
-            grade,
-            must_results,
-            nice_results,
-            numeric_results,
-            enum_results,
-            reject_results,
-            risks
-        )
-
-        summary = self._generate_summary(total_score, grade, len(risks))
+        if generate_explanation:
+            explanation = self._generate_explanation(
+                candidate,
+                total_score,
+                grade,
+                must_results,
+                nice_results,
+                numeric_results,
+                enum_results,
+                reject_results,
+                risks,
+                early_reject
+            )
+            summary = self._generate_summary(total_score, grade, len(risks))
+        else:
+            explanation = summary = ''
 
         return ScoringResult(
             total_score=round(total_score, 1),
             grade=grade,
 
-            must_score=round(must_results['score'], 1),
-            nice_score=round(nice_results['score'], 1),
-            numeric_score=round(numeric_results['score'], 1),
-            enum_score=round(enum_results['score'], 1),
-            reject_penalty=round(reject_results['penalty'], 1),
+            must_score=round(must_results.score, 1),
+            nice_score=round(nice_results.score, 1),
+            numeric_score=round(numeric_results.score, 1),
+            enum_score=round(enum_results.score, 1),
+            reject_penalty=round(reject_results.penalty, 1),
 
-            matched_must=must_results['matched'],
-            matched_nice=nice_results['matched'],
-            matched_numeric=numeric_results['matched'],
-            matched_enum=enum_results['matched'],
-            matched_reject=reject_results['matched'],
+            matched_must=must_results.matched,
+            matched_nice=nice_results.matched,
+            matched_numeric=numeric_results.matched,
+            matched_enum=enum_results.matched,
+            matched_reject=reject_results.matched,
 
-            missing_must=must_results['missing'],
-            missing_nice=nice_results['missing'],
+            missing_must=must_results.missing,
+            missing_nice=nice_results.missing,
 
             risks=risks,
             explanation=explanation,
@@ -292,80 +772,70 @@ class ScoringEngine:
 
     def _evaluate_skills(
         self,
-        candidate: CandidateData,
         skill_rules: List[SkillRule],
-        multiplier: int
-    ) -> Dict[str, Any]:
+        skill_lowers: List[str],
+        item_scores: List[int],
+        raw_text_lower: str,
+        skills_lower: Set[str],
+        found_keywords: Set[str]
+    ) -> SkillEval:
         """评估技能匹配"""
         matched = []
         missing = []
         score = 0
 
-        candidate_skills = [s.lower() for s in candidate.skills]
-        raw_text_lower = candidate.raw_text.lower()
-
-        for rule in skill_rules:
-            is_matched = self._match_skill(rule, candidate_skills, raw_text_lower)
+        for rule, skill_lower, item_score in zip(skill_rules, skill_lowers, item_scores):
+            is_matched = self._match_skill(rule, skill_lower, skills_lower, raw_text_lower, found_keywords)
 
-            if is_matched['matched']:
-                item_score = rule.weight * multiplier
+            if is_matched.matched:
                 score += item_score
                 matched.append(MatchedItem(
                     name=rule.skill,
                     weight=rule.weight,
                     score=item_score,
-                    matched_via=is_matched.get('via')
+                    matched_via=is_matched.via
                 ))
             else:
-                potential_score = rule.weight * multiplier
                 missing.append(MissingItem(
                     name=rule.skill,
                     weight=rule.weight,
-                    potential_score=potential_score
+                    potential_score=item_score
                 ))
 
-        return {
-            'score': score,
-            'matched': matched,
-            'missing': missing,
-        }
+        return SkillEval(score, matched, missing)
 
     def _match_skill(
         self,
         rule: SkillRule,
-        candidate_skills: List[str],
-        raw_text: str
-    ) -> Dict[str, Any]:
+        skill_lower: str,
+        candidate_skills: Set[str],
+        raw_text: str,
+        found_keywords: Set[str]
+    ) -> MatchCheck:
         """匹配单个技能"""
-        skill_lower = rule.skill.lower()
-
         # 关键词匹配
         if rule.type == MatchType.KEYWORD:
             if skill_lower in candidate_skills:
-                return {'matched': True, 'via': 'skills_list'}
-            if skill_lower in raw_text:
-                return {'matched': True, 'via': 'raw_text'}
+                return MatchCheck(True, 'skills_list')
+            if skill_lower in found_keywords:
+                return MatchCheck(True, 'raw_text')
 
         # 正则匹配
-        if rule.type == MatchType.REGEX and rule.pattern:
-            try:
-                if re.search(rule.pattern, raw_text, re.IGNORECASE):
-                    return {'matched': True, 'via': 'regex'}
-            except re.error as e:
-                print(f'Invalid regex pattern: {rule.pattern}, error: {e}')
+        if rule.type == MatchType.REGEX:
+            pattern = self._compiled_patterns.get(id(rule))
+            if pattern and pattern.search(raw_text):
+                return MatchCheck(True, 'regex')
 
-        return {'matched': False}
+        return MatchCheck(False)
 
-    def _evaluate_numeric_rules(self, candidate: CandidateData) -> Dict[str, Any]:
+    def _evaluate_numeric_rules(self, candidate: CandidateData) -> NumericEval:
         """评估数值规则"""
         matched = []
         score = 0
 
-        for rule in self.rules.numeric_rules:
+        for rule, accessor, matcher, item_score in self._numeric_plan:
             # 获取字段值
-            field_value = getattr(candidate, rule.field, None)
-            if field_value is None:
-                field_value = candidate.extra_fields.get(rule.field)
+            field_value = accessor(candidate)
 
             if field_value is None:
                 continue
@@ -375,8 +845,7 @@ class ScoringEngine:
             except (ValueError, TypeError):
                 continue
 
-            if self._match_numeric_rule(rule, num_value):
-                item_score = rule.weight * 5
+            if matcher(num_value):
                 score += item_score
                 matched.append(MatchedItem(
                     name=rule.label,
@@ -385,43 +854,36 @@ class ScoringEngine:
                     matched_via=f'{rule.field}={num_value}'
                 ))
 
-        return {'score': score, 'matched': matched}
-
-    def _match_numeric_rule(self, rule: NumericRule, value: float) -> bool:
-        """匹配数值规则"""
-        if rule.operator == NumericOperator.GTE:
-            return value >= rule.value
-        elif rule.operator == NumericOperator.LTE:
-            return value <= rule.value
-        elif rule.operator == NumericOperator.GT:
-            return value > rule.value
-        elif rule.operator == NumericOperator.LT:
-            return value < rule.value
-        elif rule.operator == NumericOperator.EQ:
-            return value == rule.value
-        elif rule.operator == NumericOperator.RANGE:
-            min_val, max_val = rule.value
-            return min_val <= value <= max_val
-        return False
-
-    def _evaluate_enum_rules(self, candidate: CandidateData) -> Dict[str, Any]:
+        return NumericEval(score, matched)
+
+    def _build_numeric_matchers(self) -> List[Callable[[Any], Any]]:
+        """按操作符为每条数值规则生成比较函数"""
+        matchers = []
+        for rule in self.rules.numeric_rules:
+            comparator = _NUMERIC_COMPARATORS.get(rule.operator)
+            if comparator is not None:
+                matcher = partial(comparator, rule.value)
+            elif rule.operator == NumericOperator.RANGE:
+                min_val, max_val = rule.value
+                matcher = lambda v, lo=min_val, hi=max_val: lo <= v <= hi
+            else:
+                # 未知操作符永不匹配
+                matcher = lambda v: False
+            matchers.append(matcher)
+        return matchers
+
+    def _evaluate_enum_rules(self, candidate: CandidateData) -> EnumEval:
         """评估枚举规则"""
         matched = []
         score = 0
 
-        for rule in self.rules.enum_rules:
-            field_value = getattr(candidate, rule.field, None)
-            if field_value is None:
-                field_value = candidate.extra_fields.get(rule.field)
+        for rule, accessor, value_set, item_score in self._enum_plan:
+            field_value = accessor(candidate)
 
             if not field_value:
                 continue
 
-            value_lower = str(field_value).lower()
-            is_matched = any(v.lower() == value_lower for v in rule.values)
-
-            if is_matched:
-                item_score = rule.weight * 5
+            if str(field_value).lower() in value_set:
                 score += item_score
                 matched.append(MatchedItem(
                     name=rule.label,
@@ -430,56 +892,79 @@ class ScoringEngine:
                     matched_via=f'{rule.field}={field_value}'
                 ))
 
-        return {'score': score, 'matched': matched}
+        return EnumEval(score, matched)
+
+    def _build_field_accessor(self, field_name: str) -> Callable[[CandidateData], Any]:
+        """生成候选人字段读取函数：字段为空或不存在时回退到 extra_fields"""
+        if field_name not in CandidateData.__dataclass_fields__:
+            return lambda candidate: candidate.extra_fields.get(field_name)
 
-    def _evaluate_reject_rules(self, candidate: CandidateData) -> Dict[str, Any]:
+        getter = operator.attrgetter(field_name)
+
+        def accessor(candidate: CandidateData) -> Any:
+            field_value = getter(candidate)
+            if field_value is None:
+                field_value = candidate.extra_fields.get(field_name)
+            return field_value
+
+        return accessor
+
+    def _numeric_value(self, candidate: CandidateData, accessor: Callable[[CandidateData], Any]) -> float:
+        """读取数值字段，缺失或无法转换时返回 NaN"""
+        field_value = accessor(candidate)
+        if field_value is None:
+            return math.nan
+        try:
+            return float(field_value)
+        except (ValueError, TypeError):
+            return math.nan
+
+    def _evaluate_reject_rules(self, found_keywords: Set[str], raw_text_lower: str) -> RejectEval:
         """评估拒绝规则"""
         matched = []
         penalty = 0
+        occurrences = {}
 
-        raw_text_lower = candidate.raw_text.lower()
-
-        for rule in self.rules.reject_rules:
-            keyword_lower = rule.keyword.lower()
-            if keyword_lower in raw_text_lower:
+        for rule, keyword_lower in zip(self.rules.reject_rules, self._reject_keyword_lowers):
+            if keyword_lower in found_keywords:
                 matched.append(rule.keyword)
-                penalty += rule.penalty
+                if rule.per_occurrence:
+                    # 只对命中的关键词计数，str.count 一次扫描完成
+                    count = raw_text_lower.count(keyword_lower)
+                    occurrences[rule.keyword] = count
+                    penalty += rule.penalty * count
+                else:
+                    penalty += rule.penalty
 
-        return {'penalty': penalty, 'matched': matched}
+        return RejectEval(penalty, matched, occurrences)
 
     def _determine_grade(self, score: float) -> Grade:
         """确定等级"""
-        thresholds = self.rules.grade_thresholds
-
-        if score >= thresholds.A:
-            return Grade.A
-        elif score >= thresholds.B:
-            return Grade.B
-        elif score >= thresholds.C:
-            return Grade.C
-        return Grade.D
+        # 低于 D 阈值的分数同样归为 D
+        index = bisect.bisect_right(self._grade_thresholds_sorted, score) - 1
+        return self._grades_sorted[max(0, index)]
 
     def _identify_risks(
         self,
         candidate: CandidateData,
-        must_results: Dict,
-        reject_results: Dict,
+        must_results: SkillEval,
+        reject_results: RejectEval,
         total_score: float
     ) -> List[RiskItem]:
         """识别风险点"""
         risks = []
 
         # 1. 拒绝关键词风险
-        if reject_results['matched']:
+        if reject_results.matched:
             risks.append(RiskItem(
                 type=RiskType.REJECT_KEYWORD,
                 severity=RiskSeverity.HIGH,
-                description=f"包含拒绝关键词: {', '.join(reject_results['matched'])}",
-                impact=f"扣除 {reject_results['penalty']} 分"
+                description=f"包含拒绝关键词: {', '.join(reject_results.matched)}",
+                impact=f"扣除 {reject_results.penalty} 分"
             ))
 
         # 2. 关键技能缺失
-        critical_missing = [m for m in must_results['missing'] if m.weight >= 3]
+        critical_missing = [m for m in must_results.missing if m.weight >= 3]
         if critical_missing:
             skills = ', '.join([m.name for m in critical_missing])
             risks.append(RiskItem(
@@ -514,73 +999,73 @@ class ScoringEngine:
         candidate: CandidateData,
         total_score: float,
         grade: Grade,
-        must_results: Dict,
-        nice_results: Dict,
-        numeric_results: Dict,
-        enum_results: Dict,
-        reject_results: Dict,
-        risks: List[RiskItem]
+        must_results: SkillEval,
+        nice_results: SkillEval,
+        numeric_results: NumericEval,
+        enum_results: EnumEval,
+        reject_results: RejectEval,
+        risks: List[RiskItem],
+        early_reject: bool = False
     ) -> str:
         """生成详细解释"""
-        lines = []
-
-        lines.append('=== 评分详情 ===\n')
-        lines.append(f'总分: {total_score:.1f} / 100')
-        lines.append(f'等级: {grade.value}\n')
-
-        # Must 技能
-        lines.append(f'【必备技能】得分: {must_results["score"]:.1f}')
-        if must_results['matched']:
-            lines.append(f"✓ 匹配 ({len(must_results['matched'])}/{len(self.rules.must_skills)}):")
-            for m in must_results['matched']:
-                lines.append(f'  - {m.name} (权重{m.weight}, +{m.score:.1f}分)')
-        if must_results['missing']:
-            lines.append(f"✗ 缺失 ({len(must_results['missing'])}):")
-            for m in must_results['missing']:
-                lines.append(f'  - {m.name} (权重{m.weight}, 损失{m.potential_score:.1f}分)')
-        lines.append('')
-
-        # Nice 技能
-        if self.rules.nice_skills:
-            lines.append(f'【加分技能】得分: {nice_results["score"]:.1f}')
-            if nice_results['matched']:
-                lines.append(f"✓ 匹配 ({len(nice_results['matched'])}/{len(self.rules.nice_skills)}):")
-                for m in nice_results['matched']:
-                    lines.append(f'  - {m.name} (权重{m.weight}, +{m.score:.1f}分)')
-            else:
-                lines.append('  未匹配到加分技能')
-            lines.append('')
+        buf = io.StringIO()
+        w = buf.write
+
+        w(f'=== 评分详情 ===\n\n总分: {total_score:.1f} / 100\n等级: {grade.value}\n\n')
+
+        if early_reject:
+            w('【提前拒绝】拒绝扣分已达到最高可得分，未评估其他规则\n\n')
+        else:
+            # Must 技能
+            if self.rules.must_skills:
+                w(f'【必备技能】得分: {must_results.score:.1f}\n')
+                if must_results.matched:
+                    w(f'✓ 匹配 ({len(must_results.matched)}/{len(self.rules.must_skills)}):\n')
+                    for m in must_results.matched:
+                        w(f'  - {m.name} (权重{m.weight}, +{m.score:.1f}分)\n')
+                if must_results.missing:
+                    w(f'✗ 缺失 ({len(must_results.missing)}):\n')
+                    for m in must_results.missing:
+                        w(f'  - {m.name} (权重{m.weight}, 损失{m.potential_score:.1f}分)\n')
+                w('\n')
+
+            # Nice 技能
+            if self.rules.nice_skills:
+                w(f'【加分技能】得分: {nice_results.score:.1f}\n')
+                if nice_results.matched:
+                    w(f'✓ 匹配 ({len(nice_results.matched)}/{len(self.rules.nice_skills)}):\n')
+                    for m in nice_results.matched:
+                        w(f'  - {m.name} (权重{m.weight}, +{m.score:.1f}分)\n')
+                else:
+                    w('  未匹配到加分技能\n')
+                w('\n')
 
         # 拒绝关键词
-        if reject_results['matched']:
-            lines.append(f'【拒绝关键词】扣分: -{reject_results["penalty"]:.1f}')
-            for keyword in reject_results['matched']:
-                rule = next((r for r in self.rules.reject_rules if r.keyword == keyword), None)
+        if reject_results.matched:
+            w(f'【拒绝关键词】扣分: -{reject_results.penalty:.1f}\n')
+            for keyword in reject_results.matched:
+                rule = self._reject_by_keyword.get(keyword)
                 penalty = rule.penalty if rule else 15
-                lines.append(f'  ✗ "{keyword}" (-{penalty}分)')
-            lines.append('')
+                count = reject_results.occurrences.get(keyword)
+                if count:
+                    w(f'  ✗ "{keyword}" (-{penalty}分 × {count}次)\n')
+                else:
+                    w(f'  ✗ "{keyword}" (-{penalty}分)\n')
+            w('\n')
 
         # 风险点
         if risks:
-            lines.append('【风险提示】')
+            w('【风险提示】\n')
             for risk in risks:
                 icon = '⚠️' if risk.severity == RiskSeverity.HIGH else 'ℹ️'
-                lines.append(f'  {icon} {risk.description}')
-                lines.append(f'     → {risk.impact}')
-            lines.append('')
+                w(f'  {icon} {risk.description}\n     → {risk.impact}\n')
+            w('\n')
 
         # 总结建议
-        lines.append('【评估总结】')
-        if grade == Grade.A:
-            lines.append('✓ 优秀候选人，强烈推荐面试')
-        elif grade == Grade.B:
-            lines.append('✓ 合格候选人，建议面试')
-        elif grade == Grade.C:
-            lines.append('⚠ 基本合格，可考虑备选')
-        else:
-            lines.append('✗ 不符合岗位要求，不推荐')
+        w('【评估总结】\n')
+        w(self._GRADE_CONCLUSIONS[grade])
 
-        return '\n'.join(lines)
+        return buf.getvalue()
 
     def _generate_summary(self, score: float, grade: Grade, risk_count: int) -> str:
         """生成简短总结"""
@@ -603,6 +1088,23 @@ class ScoringEngine:
         return asdict(self.rules)
 
 
+# ==================== 并行评分 ====================
+
+# 每个工作进程各自持有一个引擎实例，由 _init_worker_engine 创建
+_worker_engine: Optional[ScoringEngine] = None
+
+
+def _init_worker_engine(rules: ScoringRules) -> None:
+    """工作进程初始化：按规则构建引擎"""
+    global _worker_engine
+    _worker_engine = ScoringEngine(rules)
+
+
+def _score_with_worker_engine(candidate: CandidateData, generate_explanation: bool = True) -> ScoringResult:
+    """在工作进程中评分单个候选人"""
+    return _worker_engine.score(candidate, generate_explanation=generate_explanation)
+
+
 # ==================== 工具函数 ====================
 
 def create_default_rules(position_title: str) -> ScoringRules:
@@ -706,4 +1208,7 @@ if __name__ == '__main__':
 
     # 导出为JSON
     print('\n\nJSON输出:')
-    print(json.dumps(asdict(result), ensure_ascii=False, indent=2))
+    if _ORJSON_AVAILABLE:
+        print(orjson.dumps(result.to_dict(), option=orjson.OPT_INDENT_2).decode())
+    else:
+        print(json.dumps(result.to_dict(), ensure_ascii=False, indent=2))
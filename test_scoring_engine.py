@@ -9,6 +9,7 @@
 """
 
 import unittest
+from dataclasses import asdict, replace, FrozenInstanceError
 from scoring_engine import (
     ScoringEngine,
     ScoringRules,
@@ -30,9 +31,10 @@ from scoring_engine import (
 class TestScoringEngine(unittest.TestCase):
     """规则引擎核心功能测试"""
 
-    def setUp(self):
-        """测试前准备"""
-        self.rules = ScoringRules(
+    @classmethod
+    def setUpClass(cls):
+        """测试前准备：规则与候选人只构造一次，需要变体的测试用 replace 复制"""
+        cls.rules = ScoringRules(
             version='1.0.0',
             must_skills=[
                 SkillRule(skill='React', weight=3),
@@ -70,7 +72,7 @@ class TestScoringEngine(unittest.TestCase):
             nice_weight_multiplier=5,
         )
 
-        self.excellent_candidate = CandidateData(
+        cls.excellent_candidate = CandidateData(
             name='张三',
             email='zhangsan@example.com',
             phone='13800138000',
@@ -91,7 +93,7 @@ class TestScoringEngine(unittest.TestCase):
             ''',
         )
 
-        self.average_candidate = CandidateData(
+        cls.average_candidate = CandidateData(
             name='李四',
             email='lisi@example.com',
             phone='13900139000',
@@ -109,7 +111,7 @@ class TestScoringEngine(unittest.TestCase):
             ''',
         )
 
-        self.rejected_candidate = CandidateData(
+        cls.rejected_candidate = CandidateData(
             name='王五',
             email='wangwu@example.com',
             phone='13700137000',
@@ -126,6 +128,9 @@ class TestScoringEngine(unittest.TestCase):
             ''',
         )
 
+        # 不修改规则的测试共用同一个引擎
+        cls.engine = ScoringEngine(cls.rules)
+
     def test_rule_validation(self):
         """测试规则验证"""
         # 有效规则应该通过
@@ -145,10 +150,22 @@ class TestScoringEngine(unittest.TestCase):
         with self.assertRaises(ValueError):
             ScoringEngine(invalid_rules)
 
+        # 无效正则应该在构造时失败，并列出所有错误
+        invalid_rules = ScoringRules(
+            version='1.0.0',
+            must_skills=[
+                SkillRule(skill='A', weight=1, type=MatchType.REGEX, pattern='('),
+                SkillRule(skill='B', weight=1, type=MatchType.REGEX, pattern='[b'),
+            ],
+        )
+        with self.assertRaises(ValueError) as ctx:
+            ScoringEngine(invalid_rules)
+        self.assertIn("A: '('", str(ctx.exception))
+        self.assertIn("B: '[b'", str(ctx.exception))
+
     def test_excellent_candidate_scoring(self):
         """测试优秀候选人评分"""
-        engine = ScoringEngine(self.rules)
-        result = engine.score(self.excellent_candidate)
+        result = self.engine.score(self.excellent_candidate)
 
         # 应该获得高分和A级
         self.assertGreaterEqual(result.total_score, 80)
@@ -159,7 +176,7 @@ class TestScoringEngine(unittest.TestCase):
         self.assertEqual(len(result.matched_must), 3)
         self.assertEqual(len(result.missing_must), 0)
 
-        must_skills = [m.name for m in result.matched_must]
+        must_skills = {m.name for m in result.matched_must}
         self.assertIn('React', must_skills)
         self.assertIn('TypeScript', must_skills)
         self.assertIn('JavaScript', must_skills)
@@ -167,7 +184,7 @@ class TestScoringEngine(unittest.TestCase):
         # 应该匹配所有 Nice 技能
         self.assertEqual(len(result.matched_nice), 3)
 
-        nice_skills = [m.name for m in result.matched_nice]
+        nice_skills = {m.name for m in result.matched_nice}
         self.assertIn('Node.js', nice_skills)
         self.assertIn('Docker', nice_skills)
         self.assertIn('AWS', nice_skills)
@@ -185,8 +202,7 @@ class TestScoringEngine(unittest.TestCase):
 
     def test_average_candidate_scoring(self):
         """测试中等候选人评分"""
-        engine = ScoringEngine(self.rules)
-        result = engine.score(self.average_candidate)
+        result = self.engine.score(self.average_candidate)
 
         # 应该获得中等分数
         self.assertGreaterEqual(result.total_score, 40)
@@ -199,7 +215,7 @@ class TestScoringEngine(unittest.TestCase):
 
         # 应该有缺失的 Must 技能
         self.assertGreater(len(result.missing_must), 0)
-        missing_skills = [m.name for m in result.missing_must]
+        missing_skills = {m.name for m in result.missing_must}
         self.assertIn('TypeScript', missing_skills)
 
         # 应该识别风险
@@ -207,8 +223,7 @@ class TestScoringEngine(unittest.TestCase):
 
     def test_rejected_candidate_scoring(self):
         """测试被拒绝候选人评分"""
-        engine = ScoringEngine(self.rules)
-        result = engine.score(self.rejected_candidate)
+        result = self.engine.score(self.rejected_candidate)
 
         # 应该获得低分和D级
         self.assertLess(result.total_score, 40)
@@ -231,8 +246,7 @@ class TestScoringEngine(unittest.TestCase):
 
     def test_explanation_generation(self):
         """测试解释文本生成"""
-        engine = ScoringEngine(self.rules)
-        result = engine.score(self.excellent_candidate)
+        result = self.engine.score(self.excellent_candidate)
 
         # 应该生成详细解释
         self.assertIn('评分详情', result.explanation)
@@ -245,6 +259,107 @@ class TestScoringEngine(unittest.TestCase):
         self.assertIn('分', result.summary)
         self.assertLess(len(result.summary), 100)
 
+    def test_skip_explanation(self):
+        """测试不生成解释文本"""
+        result = self.engine.score(self.excellent_candidate, generate_explanation=False)
+        full_result = self.engine.score(self.excellent_candidate)
+
+        self.assertEqual(result.explanation, '')
+        self.assertEqual(result.summary, '')
+        self.assertEqual(result.total_score, full_result.total_score)
+        self.assertEqual(result.grade, full_result.grade)
+
+    def test_score_total(self):
+        """测试只计算总分"""
+        for candidate in (self.excellent_candidate, self.average_candidate, self.rejected_candidate):
+            self.assertEqual(self.engine.score_total(candidate), self.engine.score(candidate).total_score)
+
+        # 浮点倍数下与 score() 一样保留一位小数（0.1 + 0.2 = 0.30000000000000004）
+        float_rules = ScoringRules(
+            version='1.0.0',
+            must_skills=[
+                SkillRule(skill='React', weight=1),
+                SkillRule(skill='TypeScript', weight=2),
+            ],
+            must_weight_multiplier=0.1,
+        )
+        float_engine = ScoringEngine(float_rules)
+        self.assertEqual(float_engine.score_total(self.excellent_candidate), 0.3)
+        self.assertEqual(
+            float_engine.score_total(self.excellent_candidate),
+            float_engine.score(self.excellent_candidate).total_score
+        )
+
+        # 拒绝候选人只命中 0 分关键词技能：上界 = 数值 10 + 枚举 5 < 扣分 35，提前返回 0
+        self.assertEqual(self.engine.score_total(self.rejected_candidate), 0)
+
+        # 未评估的负权重规则在上界中按 0 计：React(+50) + PHP 正则(-30 未命中) - 拒绝 25 = 25
+        negative_rules = ScoringRules(
+            version='1.0.0',
+            must_skills=[
+                SkillRule(skill='React', weight=5),
+                SkillRule(skill='PHP', weight=-3, type=MatchType.REGEX, pattern='php'),
+            ],
+            reject_rules=[RejectRule(keyword='在校生', penalty=25)],
+            enable_early_reject=True,
+        )
+        candidate = replace(self.excellent_candidate, raw_text='在校生')
+        self.assertEqual(ScoringEngine(negative_rules).score_total(candidate), 25)
+
+    def test_score_cache(self):
+        """测试评分结果缓存"""
+        engine = ScoringEngine(self.rules, cache_size=1)
+        score_calls = []
+        uncached_score = engine._score
+        engine._score = lambda *args, **kwargs: score_calls.append(1) or uncached_score(*args, **kwargs)
+        result = engine.score(self.excellent_candidate)
+
+        # 内容相同的候选人命中缓存
+        same_candidate = replace(self.excellent_candidate)
+        cached = engine.score(same_candidate)
+        self.assertEqual(len(score_calls), 1)
+        self.assertEqual(cached, result)
+
+        # 调用方修改返回结果的列表不影响后续命中
+        expected = result.to_dict()
+        result.matched_must.clear()
+        cached.matched_nice.reverse()
+        self.assertEqual(engine.score(same_candidate).to_dict(), expected)
+
+        # 是否生成解释分开缓存
+        self.assertEqual(engine.score(self.excellent_candidate, generate_explanation=False).explanation, '')
+
+        # 超出容量淘汰最早的结果，清空后重新评分
+        engine.score(self.excellent_candidate)
+        self.assertEqual(len(score_calls), 3)
+        engine.invalidate_cache()
+        self.assertEqual(len(engine._cache), 0)
+
+        # 默认不缓存
+        self.assertIsNot(self.engine.score(self.excellent_candidate), self.engine.score(self.excellent_candidate))
+
+        # 1 与 1.0 作为字典键相等，但枚举按 str() 匹配，结果不同，不能互相命中
+        level_rules = ScoringRules(
+            version='1.0.0',
+            enum_rules=[EnumRule(field='level', values=['1'], weight=2, label='等级1')],
+        )
+        level_engine = ScoringEngine(level_rules, cache_size=8)
+        int_level = replace(self.excellent_candidate, extra_fields={'level': 1})
+        float_level = replace(self.excellent_candidate, extra_fields={'level': 1.0})
+        self.assertEqual(level_engine.score(int_level).total_score, 10)
+        self.assertEqual(level_engine.score(float_level).total_score, 0)
+
+        # 键类型混杂或值不可哈希时不缓存，照常评分
+        for extra_fields in ({'a': 1, 2: 'b'}, {'tags': ['x']}):
+            candidate = replace(self.excellent_candidate, extra_fields=extra_fields)
+            self.assertIsNot(engine.score(candidate), engine.score(candidate))
+
+    def test_result_to_dict(self):
+        """测试结果序列化与 asdict 一致"""
+        for candidate in (self.excellent_candidate, self.rejected_candidate):
+            result = self.engine.score(candidate)
+            self.assertEqual(result.to_dict(), asdict(result))
+
     def test_regex_matching(self):
         """测试正则表达式匹配"""
         rules_with_regex = ScoringRules(
@@ -283,13 +398,19 @@ class TestScoringEngine(unittest.TestCase):
         self.assertEqual(len(result.matched_must), 1)
         self.assertEqual(result.matched_must[0].matched_via, 'regex')
 
+        # 同一正则在不同引擎间复用编译结果
+        other_engine = ScoringEngine(rules_with_regex)
+        rule = rules_with_regex.must_skills[0]
+        self.assertIs(
+            other_engine._compiled_patterns[id(rule)],
+            engine._compiled_patterns[id(rule)]
+        )
+
     def test_numeric_operators(self):
         """测试数值规则操作符"""
         # 测试 >= 操作符
-        engine = ScoringEngine(self.rules)
-        candidate = CandidateData(
-            **{**self.excellent_candidate.__dict__, 'work_years': 3}
-        )
+        engine = self.engine
+        candidate = replace(self.excellent_candidate, work_years=3)
         result = engine.score(candidate)
         self.assertEqual(len(result.matched_numeric), 1)
 
@@ -311,9 +432,7 @@ class TestScoringEngine(unittest.TestCase):
         )
 
         engine = ScoringEngine(rules_with_gt)
-        candidate = CandidateData(
-            **{**self.excellent_candidate.__dict__, 'work_years': 4}
-        )
+        candidate = replace(self.excellent_candidate, work_years=4)
         result = engine.score(candidate)
         self.assertEqual(len(result.matched_numeric), 1)
 
@@ -335,47 +454,178 @@ class TestScoringEngine(unittest.TestCase):
         )
 
         engine = ScoringEngine(rules_with_range)
-        candidate = CandidateData(
-            **{**self.excellent_candidate.__dict__, 'work_years': 5}
-        )
+        candidate = replace(self.excellent_candidate, work_years=5)
         result = engine.score(candidate)
         self.assertEqual(len(result.matched_numeric), 1)
 
         # 超出范围不应匹配
-        candidate = CandidateData(
-            **{**self.excellent_candidate.__dict__, 'work_years': 10}
-        )
+        candidate = replace(self.excellent_candidate, work_years=10)
         result = engine.score(candidate)
         self.assertEqual(len(result.matched_numeric), 0)
 
     def test_edge_cases(self):
         """测试边界条件"""
-        engine = ScoringEngine(self.rules)
-
         # 空技能列表
-        candidate = CandidateData(
-            **{**self.excellent_candidate.__dict__, 'skills': []}
-        )
-        result = engine.score(candidate)
+        candidate = replace(self.excellent_candidate, skills=[])
+        result = self.engine.score(candidate)
         self.assertEqual(len(result.matched_must), 0)
         self.assertEqual(len(result.missing_must), 3)
 
         # 总分不应超过100
-        super_candidate = CandidateData(
-            **{**self.excellent_candidate.__dict__,
-               'skills': ['React', 'TypeScript', 'JavaScript', 'Node.js',
-                         'Docker', 'AWS', 'Python', 'Java', 'Go'],
-               'work_years': 10}
+        super_candidate = replace(
+            self.excellent_candidate,
+            skills=['React', 'TypeScript', 'JavaScript', 'Node.js',
+                    'Docker', 'AWS', 'Python', 'Java', 'Go'],
+            work_years=10
         )
-        result = engine.score(super_candidate)
+        result = self.engine.score(super_candidate)
         self.assertLessEqual(result.total_score, 100)
 
+    def test_candidate_immutable(self):
+        """测试候选人数据只读"""
+        with self.assertRaises(FrozenInstanceError):
+            self.excellent_candidate.work_years = 1
+
+        candidate = replace(self.excellent_candidate, work_years=1)
+        self.assertEqual(candidate.work_years, 1)
+        self.assertEqual(self.excellent_candidate.work_years, 5)
+
+    def test_overlapping_reject_keywords(self):
+        """测试相互重叠的拒绝关键词"""
+        rules = ScoringRules(
+            version='1.0.0',
+            reject_rules=[
+                RejectRule(keyword='实习', penalty=15),
+                RejectRule(keyword='实习生', penalty=10),
+                RejectRule(keyword='习生', penalty=5),
+            ],
+        )
+        engine = ScoringEngine(rules)
+
+        candidate = replace(self.excellent_candidate, raw_text='目前是实习生')
+        result = engine.score(candidate)
+
+        # 三个关键词都应命中
+        self.assertEqual(sorted(result.matched_reject), sorted(['实习', '实习生', '习生']))
+        self.assertEqual(result.reject_penalty, 30)
+
+        # 未安装 pyahocorasick 时的逐个子串查找结果一致
+        engine._keyword_automaton = None
+        fallback_result = engine.score(candidate)
+        self.assertEqual(sorted(fallback_result.matched_reject), sorted(result.matched_reject))
+        self.assertEqual(fallback_result.reject_penalty, result.reject_penalty)
+
+    def test_empty_reject_keyword(self):
+        """测试只有空拒绝关键词时不构建自动机"""
+        rules = ScoringRules(
+            version='1.0.0',
+            reject_rules=[RejectRule(keyword='', penalty=5)],
+        )
+        engine = ScoringEngine(rules)
+        self.assertIsNone(engine._keyword_automaton)
+
+        # 空关键词按子串语义总是命中
+        result = engine.score(self.excellent_candidate)
+        self.assertEqual(result.matched_reject, [''])
+        self.assertEqual(result.reject_penalty, 5)
+        self.assertEqual(engine.score_total(self.excellent_candidate), result.total_score)
+
+    def test_per_occurrence_reject(self):
+        """测试按出现次数扣分的拒绝关键词"""
+        rules = ScoringRules(
+            version='1.0.0',
+            reject_rules=[
+                RejectRule(keyword='实习', penalty=5, per_occurrence=True),
+                RejectRule(keyword='在校生', penalty=20),
+            ],
+        )
+        engine = ScoringEngine(rules)
+
+        candidate = replace(self.excellent_candidate, raw_text='在校生，实习经历：实习一、实习二')
+        result = engine.score(candidate)
+
+        # 实习出现 3 次 (3×5)，在校生固定扣 20
+        self.assertEqual(result.matched_reject, ['实习', '在校生'])
+        self.assertEqual(result.reject_penalty, 35)
+        self.assertIn('× 3次', result.explanation)
+        self.assertEqual(engine.score_total(candidate), result.total_score)
+
+    def test_early_reject(self):
+        """测试拒绝扣分超过最高可得分时提前判定"""
+        rules = replace(
+            self.rules,
+            reject_rules=[RejectRule(keyword='在校生', penalty=200)],
+            enable_early_reject=True
+        )
+        engine = ScoringEngine(rules)
+        result = engine.score(self.rejected_candidate)
+
+        self.assertEqual(result.total_score, 0)
+        self.assertEqual(result.grade, Grade.D)
+        self.assertEqual(result.matched_reject, ['在校生'])
+        self.assertEqual(result.matched_must, [])
+        self.assertIn('提前拒绝', result.explanation)
+
+        # 关闭后走完整评估，总分与等级不变
+        rules = replace(rules, enable_early_reject=False)
+        full_result = ScoringEngine(rules).score(self.rejected_candidate)
+        self.assertEqual(full_result.total_score, result.total_score)
+        self.assertEqual(full_result.grade, result.grade)
+        self.assertEqual(len(full_result.missing_must), 3)
+
+        # 默认关闭，结果保留完整的匹配明细
+        self.assertFalse(ScoringRules(version='1.0.0').enable_early_reject)
+
+        # 负权重规则不命中反而得分更高，上界按 0 计：React(+50) - 拒绝 25 = 25
+        negative_rules = ScoringRules(
+            version='1.0.0',
+            must_skills=[
+                SkillRule(skill='React', weight=5),
+                SkillRule(skill='PHP', weight=-3),
+            ],
+            reject_rules=[RejectRule(keyword='在校生', penalty=25)],
+            enable_early_reject=True,
+        )
+        candidate = replace(self.excellent_candidate, raw_text='在校生')
+        self.assertEqual(ScoringEngine(negative_rules).score(candidate).total_score, 25)
+
+    def test_score_batch(self):
+        """测试批量评分与逐个评分结果一致"""
+        candidates = [
+            self.excellent_candidate,
+            self.average_candidate,
+            self.rejected_candidate,
+        ]
+
+        batch_results = self.engine.score_batch(candidates)
+        self.assertEqual(len(batch_results), len(candidates))
+
+        for candidate, batch_result in zip(candidates, batch_results):
+            result = self.engine.score(candidate)
+            self.assertEqual(batch_result.total_score, result.total_score)
+            self.assertEqual(batch_result.grade, result.grade)
+            self.assertEqual(batch_result.matched_numeric, result.matched_numeric)
+            self.assertEqual(batch_result.matched_enum, result.matched_enum)
+
+        self.assertEqual(self.engine.score_batch([]), [])
+
+    def test_score_batch_parallel(self):
+        """测试并行批量评分"""
+        candidates = [
+            self.excellent_candidate,
+            self.average_candidate,
+            self.rejected_candidate,
+        ] * 3
+        expected = [self.engine.score(c).total_score for c in candidates]
+
+        for use_processes in (True, False):
+            results = self.engine.score_batch_parallel(candidates, max_workers=2, use_processes=use_processes)
+            self.assertEqual([r.total_score for r in results], expected)
+
     def test_score_bounds(self):
         """测试分数边界"""
-        engine = ScoringEngine(self.rules)
-
         # 极低分数不应低于0
-        result = engine.score(self.rejected_candidate)
+        result = self.engine.score(self.rejected_candidate)
         self.assertGreaterEqual(result.total_score, 0)
         self.assertLessEqual(result.total_score, 100)
 